@@ -0,0 +1,641 @@
+# core/compiler.py
+"""
+The compiler turns an AST into a Python closure that takes an environment
+and computes the expression's value. Dispatching on the shape of a form
+happens once, when it is compiled, rather than every time it is evaluated;
+lambda bodies in particular are compiled once, when the lambda form is,
+and not on every call.
+
+Calls in tail position don't grow the Python stack: instead of calling a
+LISP procedure, they hand it back to the procedure running them, which
+calls it in a loop (a trampoline).
+"""
+
+import operator as op
+from collections import deque
+
+from .types import Symbol, List, Macro
+from .environment import Environment, _add, _multiply
+from .errors import LogosEvaluationError, LogosError
+from .parser import parse_file_iter
+
+# Symbols are interned, so special forms are recognized by identity.
+_QUOTE = Symbol('quote')
+_QUASIQUOTE = Symbol('quasiquote')
+_UNQUOTE = Symbol('unquote')
+_UNQUOTE_SPLICING = Symbol('unquote-splicing')
+_IF = Symbol('if')
+_DEFVAR = Symbol('defvar')
+_DEFMACRO = Symbol('defmacro')
+_SET = Symbol('set!')
+_LAMBDA = Symbol('lambda')
+_DEFUN = Symbol('defun')
+_DEFUN_PURE = Symbol('defun-pure')
+_BEGIN = Symbol('begin')
+_AND = Symbol('and')
+_OR = Symbol('or')
+_WHILE = Symbol('while')
+_LOAD = Symbol('load')
+_TRY = Symbol('try')
+_CATCH = Symbol('catch')
+_HASH_MAP = Symbol('hash-map')
+_DOT = Symbol('.')
+
+def _compile_template(x, level):
+    """
+    Compiles a quasiquoted template at the given nesting level of
+    quasiquote into a closure that builds it. Which parts are constant and
+    which are unquoted is decided here, once, rather than by walking the
+    template each time it is built.
+    """
+    if not isinstance(x, List) or not x:
+        return lambda env: x
+
+    op = x[0]
+
+    if op is _QUASIQUOTE:
+        inner = _compile_template(x[1], level + 1)
+        return lambda env: [_QUASIQUOTE, inner(env)]
+
+    if op is _UNQUOTE or op is _UNQUOTE_SPLICING:
+        if level == 1:
+            if op is _UNQUOTE_SPLICING:
+                # Spliced outside of a list: the splice marker is kept.
+                splice = _compile_splice(x[1])
+                return lambda env: [Symbol.SPLICE] + splice(env)
+            return compile_ast(x[1])
+        inner = _compile_template(x[1], level - 1)
+        return lambda env: [op, inner(env)]
+
+    # Runs of atoms are copied in as they are; only nested lists and
+    # unquotes need building each time.
+    parts = []
+    for item in x:
+        if not isinstance(item, List) or not item:
+            if parts and parts[-1][0] is _CONSTANTS:
+                parts[-1][1].append(item)
+            else:
+                parts.append((_CONSTANTS, [item]))
+        elif item[0] is _UNQUOTE_SPLICING and level == 1:
+            parts.append((_SPLICED, _compile_splice(item[1])))
+        else:
+            parts.append((_BUILT, _compile_template(item, level)))
+
+    if len(parts) == 1 and parts[0][0] is _CONSTANTS:
+        constants = parts[0][1]
+        return lambda env: list(constants)
+
+    def build(env):
+        result = []
+        for kind, part in parts:
+            if kind is _CONSTANTS:
+                result.extend(part)
+            elif kind is _BUILT:
+                result.append(part(env))
+            else:
+                result.extend(part(env))
+        return result
+    return build
+
+# The kinds of part a list template is built from.
+_CONSTANTS, _BUILT, _SPLICED = 'constants', 'built', 'spliced'
+
+def _compile_splice(x):
+    """Compiles the expression of an unquote-splicing, which must yield a list."""
+    value_of = compile_ast(x)
+    def splice(env):
+        result = value_of(env)
+        if not isinstance(result, List):
+            raise LogosEvaluationError("unquote-splicing must be used with a list.")
+        return result
+    return splice
+
+
+class Procedure:
+    """A procedure created by a lambda form: a compiled body and its scope."""
+    __slots__ = ('params', 'rest_param', 'body', 'env')
+
+    def __init__(self, params, rest_param, body, env):
+        self.params = params # The fixed parameters
+        self.rest_param = rest_param # Bound to a list of any further arguments
+        self.body = body
+        self.env = env
+
+    def bind(self, arguments) -> Environment:
+        """Creates the environment the body runs in for one call."""
+        fixed_params = self.params
+        local_env = Environment(outer=self.env)
+        if self.rest_param:
+            if len(arguments) < len(fixed_params):
+                raise LogosEvaluationError(f"Procedure expects at least {len(fixed_params)} arguments, got {len(arguments)}")
+            local_env.update(zip(fixed_params, arguments))
+            local_env.define(self.rest_param, list(arguments[len(fixed_params):]))
+        else:
+            if len(fixed_params) != len(arguments):
+                raise LogosEvaluationError(f"Procedure expects {len(fixed_params)} arguments, got {len(arguments)}")
+            local_env.update(zip(fixed_params, arguments))
+        return local_env
+
+    def __call__(self, *arguments):
+        # The trampoline runs here rather than in a helper, so a call that
+        # isn't in tail position costs no extra Python frame.
+        result = self.body(self.bind(arguments))
+        while type(result) is _TailCall:
+            proc = result.proc
+            result = proc.body(proc.bind(result.args))
+        return result
+
+
+# Marks an empty memo slot; unlike None, it can't be a memo key.
+_NO_KEY = object()
+
+class PureProcedure(Procedure):
+    """
+    A procedure from defun-pure, whose results are cached on its arguments.
+    Calls mostly repeat the last arguments, so the most recent result is
+    kept in two slots, and older ones in a dict.
+    """
+    __slots__ = ('memo', 'memo_key', 'memo_value')
+
+    def __init__(self, params, rest_param, body, env):
+        super().__init__(params, rest_param, body, env)
+        self.memo = {}
+        self.memo_key = _NO_KEY
+        self.memo_value = None
+
+    def __call__(self, *arguments):
+        # Arguments are keyed with their types, since 1, 1.0 and #t (or a
+        # symbol and a string with the same name) are equal in Python.
+        key = tuple(zip(map(type, arguments), arguments))
+        if key == self.memo_key:
+            return self.memo_value
+        try:
+            result = self.memo.get(key, _NO_KEY)
+        except TypeError:
+            # Unhashable arguments (lists, hash-maps) aren't cached.
+            return Procedure.__call__(self, *arguments)
+        if result is _NO_KEY:
+            result = Procedure.__call__(self, *arguments)
+        if self.memo_key is not _NO_KEY:
+            self.memo[self.memo_key] = self.memo_value
+        self.memo_key, self.memo_value = key, result
+        return result
+
+
+class _TailCall:
+    """A call to a procedure, returned from tail position to be made by the caller."""
+    __slots__ = ('proc', 'args')
+
+    def __init__(self, proc, args):
+        self.proc = proc
+        self.args = args
+
+
+def compile_ast(x, tail=False):
+    """
+    Compiles an expression into a function of one argument, the
+    environment to evaluate it in. If `tail` is true, the expression is
+    in tail position of a procedure body, and calls to procedures it
+    ends with are returned as a `_TailCall` instead of being made.
+    """
+    if isinstance(x, Symbol):
+        def lookup(env):
+            try:
+                return env.lookup(x)
+            except NameError:
+                raise LogosEvaluationError(f"Symbol '{x}' not found.")
+        return lookup
+
+    elif not isinstance(x, List):
+        return lambda env: x
+
+    if not x:
+        return lambda env: []
+
+    try:
+        return _compile_form(x, tail)
+    except Exception:
+        # A malformed form must only fail if it is actually evaluated (it
+        # may sit in a branch that never runs), so compiling it is retried,
+        # and the error raised, at that point instead.
+        return lambda env: _compile_form(x, tail)(env)
+
+
+def _compile_body(body):
+    """Compiles a sequence of forms, run for the value of the last, as a procedure body."""
+    return compile_ast(body[0] if len(body) == 1 else [_BEGIN] + body, tail=True)
+
+
+def _compile_form(x, tail):
+    """Compiles a non-empty list: a special form, macro use or call."""
+    op, *args = x
+    # Special forms are found with one dict probe on the (interned) head
+    # symbol; unhashable heads, like a lambda form, can't be one.
+    compile_special = _SPECIAL_FORMS.get(op) if isinstance(op, Symbol) else None
+    if compile_special is not None:
+        return compile_special(args, tail)
+    return _compile_call(op, args, tail)
+
+
+def _compile_quote(args, tail):
+    """Compiles `(quote datum)`."""
+    value = args[0]
+    return lambda env: value
+
+
+def _compile_quasiquote(args, tail):
+    """Compiles `(quasiquote template)`."""
+    return _compile_template(args[0], level=1)
+
+
+def _compile_if(args, tail):
+    """Compiles `(if test conseq [alt])`."""
+    if len(args) not in (2, 3):
+        raise LogosEvaluationError(f"if form expects 2 or 3 arguments, but got {len(args)}")
+    test, conseq = compile_ast(args[0]), compile_ast(args[1], tail)
+    if len(args) == 2:
+        return lambda env: conseq(env) if test(env) else None
+    alt = compile_ast(args[2], tail)
+    return lambda env: conseq(env) if test(env) else alt(env)
+
+
+def _compile_defvar(args, tail):
+    """Compiles `(defvar symbol expr)`."""
+    (symbol, expr) = args
+    value_of = compile_ast(expr)
+    def defvar(env):
+        # Find the global environment by traversing up the outer chain.
+        global_env = env
+        while global_env.outer is not None:
+            global_env = global_env.outer
+
+        # Only define the variable if it's not already in the global scope.
+        if symbol not in global_env:
+            global_env.define(symbol, value_of(env))
+
+        # Return the value from the global scope.
+        return global_env[symbol]
+    return defvar
+
+
+def _compile_defmacro(args, tail):
+    """Compiles `(defmacro name params body...)`."""
+    (name, params, *body) = args
+    body_expr = body[0] if len(body) == 1 else [_BEGIN] + body
+    code = compile_ast(body_expr)
+    def defmacro(env):
+        macro = Macro(params, body_expr, env)
+        macro.code = code
+        env.define_macro(name, macro)
+        return None
+    return defmacro
+
+
+def _compile_set(args, tail):
+    """Compiles `(set! symbol expr)`."""
+    (symbol, expr) = args
+    value_of = compile_ast(expr)
+    def set_(env):
+        value = value_of(env)
+        env.set(symbol, value)
+        return value
+    return set_
+
+
+def _compile_lambda(args, tail):
+    """Compiles `(lambda params body...)`."""
+    (params, *body) = args
+    if not body:
+        raise LogosEvaluationError("lambda form must have a body.")
+    return _compile_procedure(params, _compile_body(body))
+
+
+def _compile_defun(args, tail, pure=False):
+    """Compiles `(defun name params body...)`, or `defun-pure` if `pure` is true."""
+    (name, params, *body) = args
+    # Skip docstring if present
+    if isinstance(body[0], str) and not isinstance(body[0], Symbol):
+        body = body[1:]
+    make_func = _compile_procedure(params, _compile_body(body), pure)
+    def defun(env):
+        func = make_func(env)
+        env.define(name, func)
+        return func
+    return defun
+
+
+def _compile_defun_pure(args, tail):
+    """Compiles `(defun-pure name params body...)`."""
+    return _compile_defun(args, tail, pure=True)
+
+
+def _compile_begin(args, tail):
+    """Compiles `(begin expr...)`."""
+    if not args:
+        return lambda env: None
+    *exprs, last = [compile_ast(expr) for expr in args[:-1]] + [compile_ast(args[-1], tail)]
+    def begin(env):
+        for expr in exprs:
+            expr(env)
+        return last(env)
+    return begin
+
+
+def _compile_and(args, tail):
+    """
+    Compiles `(and expr...)`, which is #f if any expression is false and
+    otherwise the value of the last one. The common short forms are
+    lowered to Python's own short-circuiting `and`/`or`.
+    """
+    exprs = [compile_ast(expr) for expr in args]
+    if not exprs:
+        return lambda env: True
+    if len(exprs) == 1:
+        a, = exprs
+        return lambda env: a(env) or False
+    if len(exprs) == 2:
+        a, b = exprs
+        return lambda env: a(env) and b(env) or False
+    if len(exprs) == 3:
+        a, b, c = exprs
+        return lambda env: a(env) and b(env) and c(env) or False
+    def and_(env):
+        val = True
+        for expr in exprs:
+            val = expr(env)
+            if not val:
+                return False
+        return val
+    return and_
+
+
+def _compile_or(args, tail):
+    """
+    Compiles `(or expr...)`, which is #t if any expression is true and
+    otherwise the (false) value of the last one.
+    """
+    exprs = [compile_ast(expr) for expr in args]
+    if not exprs:
+        return lambda env: False
+    *rest, last = exprs
+    if len(rest) <= 2:
+        # `x or y` stops at the first true value; `_true_or_self` then
+        # turns a true value into #t and leaves a false one as it is.
+        if not rest:
+            return lambda env: _true_or_self(last(env))
+        if len(rest) == 1:
+            a, = rest
+            return lambda env: _true_or_self(a(env) or last(env))
+        a, b = rest
+        return lambda env: _true_or_self(a(env) or b(env) or last(env))
+    def or_(env):
+        val = False
+        for expr in exprs:
+            val = expr(env)
+            if val:
+                return True
+        return val
+    return or_
+
+
+def _true_or_self(val):
+    return True if val else val
+
+
+def _compile_while(args, tail):
+    """Compiles `(while condition body...)`."""
+    if len(args) < 2:
+        raise LogosEvaluationError(f"while form expects at least 2 arguments (condition and body), but got {len(args)}")
+    condition, body = compile_ast(args[0]), compile_ast([_BEGIN] + args[1:])
+    def while_(env):
+        result = None
+        while condition(env):
+            result = body(env)
+        return result
+    return while_
+
+
+def _compile_load(args, tail):
+    """Compiles `(load filepath)`."""
+    (filepath_expr,) = args
+    filepath_of = compile_ast(filepath_expr)
+    def load(env):
+        filepath = filepath_of(env)
+        if not isinstance(filepath, str):
+            raise LogosEvaluationError(f"load expected a string filepath, but got {type(filepath)}")
+        try:
+            forms = parse_file_iter(filepath)
+        except FileNotFoundError:
+            raise LogosError(f"File not found: {filepath}")
+        # Files the loaded code itself can't find aren't reported as this one.
+        results = deque((compile_ast(form)(env) for form in forms), maxlen=1)
+        return results[0] if results else None
+    return load
+
+
+def _compile_try(args, tail):
+    """Compiles `(try body (catch error-var handler))`."""
+    if len(args) != 2:
+        raise LogosEvaluationError(f"try form expects 2 arguments (body and a catch clause), but got {len(args)}")
+
+    body_expr, catch_clause = args
+
+    if not (isinstance(catch_clause, List) and len(catch_clause) == 3 and catch_clause[0] is _CATCH):
+        raise LogosEvaluationError("try form must be followed by a (catch <error-var> <body>) clause.")
+
+    _, error_var, catch_body = catch_clause
+    # The body can't be in tail position: its calls must run inside the try.
+    body, handler = compile_ast(body_expr), compile_ast(catch_body, tail)
+
+    def try_(env):
+        try:
+            return body(env)
+        except LogosEvaluationError as e:
+            catch_env = Environment(outer=env)
+            catch_env.define(error_var, str(e))
+            return handler(catch_env)
+    return try_
+
+
+def _compile_hash_map(args, tail):
+    """Compiles `(hash-map key value ...)`."""
+    if len(args) % 2 != 0:
+        raise LogosEvaluationError("hash-map requires an even number of arguments for key-value pairs.")
+    pairs = [(compile_ast(args[i]), compile_ast(args[i+1])) for i in range(0, len(args), 2)]
+    return lambda env: {key(env): value(env) for key, value in pairs}
+
+
+# Compiles each special form, given its arguments and whether it is in tail position.
+_SPECIAL_FORMS = {
+    _QUOTE: _compile_quote,
+    _QUASIQUOTE: _compile_quasiquote,
+    _IF: _compile_if,
+    _DEFVAR: _compile_defvar,
+    _DEFMACRO: _compile_defmacro,
+    _SET: _compile_set,
+    _LAMBDA: _compile_lambda,
+    _DEFUN: _compile_defun,
+    _DEFUN_PURE: _compile_defun_pure,
+    _BEGIN: _compile_begin,
+    _AND: _compile_and,
+    _OR: _compile_or,
+    _WHILE: _compile_while,
+    _LOAD: _compile_load,
+    _TRY: _compile_try,
+    _HASH_MAP: _compile_hash_map,
+}
+
+
+def _compile_procedure(params, body, pure=False):
+    """Compiles a lambda form whose body has already been compiled."""
+    rest_param = None
+    fixed_params = params
+    if _DOT in params:
+        dot_index = params.index(_DOT)
+        if dot_index != len(params) - 2:
+            raise LogosEvaluationError("Syntax error: '.' in parameter list.")
+        fixed_params = params[:dot_index]
+        rest_param = params[dot_index + 1]
+
+    procedure_type = PureProcedure if pure else Procedure
+    return lambda env: procedure_type(fixed_params, rest_param, body, env)
+
+
+def _expand_macro(macro, op, args):
+    """Expands a use of a macro into the code it stands for."""
+    # Create a temporary environment for macro expansion
+    macro_expansion_env = Environment(outer=macro.env)
+
+    # Bind macro arguments to parameters
+    # Handle variadic macros
+    params = macro.params
+    if _DOT in params:
+        dot_index = params.index(_DOT)
+        fixed_params = params[:dot_index]
+        rest_param = params[dot_index + 1]
+        if len(args) < len(fixed_params):
+            raise LogosEvaluationError(f"Macro '{op}' expects at least {len(fixed_params)} arguments, got {len(args)}")
+        macro_expansion_env.update(zip(fixed_params, args))
+        macro_expansion_env.define(rest_param, list(args[len(fixed_params):]))
+    else:
+        if len(params) != len(args):
+            raise LogosEvaluationError(f"Macro '{op}' expects {len(params)} arguments, but got {len(args)}")
+        macro_expansion_env.update(zip(params, args))
+
+    # Evaluate the macro body in the temporary environment to get the expanded code
+    return macro.code(macro_expansion_env)
+
+
+# Calls to these arithmetic and comparison primitives, with these numbers
+# of arguments, are compiled to the Python operator itself. `+` and `*`
+# start from 0 and 1 like sum() and math.prod() do, so they reject the
+# same operands (e.g. strings for `+`). From Python 3.12, sum() adds floats
+# with compensated summation, which `a + b + c` wouldn't match, so three
+# operands still go through sum(), just without the argument list.
+_INLINE_OPERATORS = {
+    Symbol('+'): (_add, {
+        2: lambda a, b: lambda env: 0 + a(env) + b(env),
+        3: lambda a, b, c: lambda env: sum((a(env), b(env), c(env))),
+    }),
+    Symbol('*'): (_multiply, {
+        2: lambda a, b: lambda env: 1 * a(env) * b(env),
+        3: lambda a, b, c: lambda env: 1 * a(env) * b(env) * c(env),
+    }),
+    Symbol('-'): (op.sub, {2: lambda a, b: lambda env: a(env) - b(env)}),
+    Symbol('/'): (op.truediv, {2: lambda a, b: lambda env: a(env) / b(env)}),
+    Symbol('%'): (op.mod, {2: lambda a, b: lambda env: a(env) % b(env)}),
+    Symbol('>'): (op.gt, {2: lambda a, b: lambda env: a(env) > b(env)}),
+    Symbol('<'): (op.lt, {2: lambda a, b: lambda env: a(env) < b(env)}),
+    Symbol('>='): (op.ge, {2: lambda a, b: lambda env: a(env) >= b(env)}),
+    Symbol('<='): (op.le, {2: lambda a, b: lambda env: a(env) <= b(env)}),
+    Symbol('='): (op.eq, {2: lambda a, b: lambda env: a(env) == b(env)}),
+}
+
+
+def _compile_call(op, args, tail):
+    """
+    Compiles a form headed by something other than a special form. Whether
+    a symbol names a macro depends on the environment, so that is decided
+    each time the form is evaluated.
+    """
+    call = _compile_general_call(op, args, tail)
+    if not (isinstance(op, Symbol) and op in _INLINE_OPERATORS):
+        return call
+    primitive, builders = _INLINE_OPERATORS[op]
+    build = builders.get(len(args))
+    if build is None:
+        return call
+
+    inline = build(*[compile_ast(arg) for arg in args])
+
+    def inline_call(env):
+        # The symbol may be unbound or rebound, or also name a macro; if so,
+        # the general call reports or handles that.
+        try:
+            proc = env.lookup(op)
+        except NameError:
+            return call(env)
+        if proc is not primitive or env.find_macro(op) is not None:
+            return call(env)
+        try:
+            return inline(env)
+        except TypeError as e:
+            raise LogosEvaluationError(f"Error calling procedure '{op}': {e}")
+    return inline_call
+
+
+def _compile_general_call(op, args, tail):
+    """Compiles a macro use or a call to any procedure."""
+    proc_of = compile_ast(op)
+    # The arguments of a macro use needn't be code, so they are compiled
+    # only once the form turns out to be a procedure call.
+    compiled_args = None
+    # The last macro this form was expanded with, and its compiled expansion.
+    # Macros are expanded once per call site: the expansion is reused for as
+    # long as the symbol still names the same macro (redefining it with
+    # defmacro creates a new one), so a macro's expansion-time side effects,
+    # gensym included, happen once per call site rather than per evaluation.
+    expanded_by = expansion = None
+
+    def call(env):
+        nonlocal compiled_args, expanded_by, expansion
+        # Macro expansion
+        if isinstance(op, Symbol):
+            macro_env = env.find_macro(op)
+            if macro_env is not None:
+                macro = macro_env.macros[op]
+                if macro is not expanded_by:
+                    expansion = compile_ast(_expand_macro(macro, op, args), tail)
+                    expanded_by = macro
+                # Evaluate the expanded code in the original environment
+                return expansion(env)
+
+        # Procedure call
+        proc = proc_of(env)
+        if not callable(proc):
+            raise LogosEvaluationError(f"'{op}' is not a procedure.")
+
+        if compiled_args is None:
+            compiled_args = [compile_ast(arg) for arg in args]
+        evaluated_args = [arg(env) for arg in compiled_args]
+        if type(proc) is Procedure:
+            if tail:
+                return _TailCall(proc, evaluated_args)
+            # Run the procedure here, as Procedure.__call__ would. Calling
+            # the instance would go through its __call__ slot, which costs
+            # recursion depth on top of the Python frame.
+            try:
+                result = proc.body(proc.bind(evaluated_args))
+                while type(result) is _TailCall:
+                    proc = result.proc
+                    result = proc.body(proc.bind(result.args))
+                return result
+            except TypeError as e:
+                raise LogosEvaluationError(f"Error calling procedure '{op}': {e}")
+        # Python primitives, and pure procedures (so their results are
+        # cached even from tail position), are called as they are.
+        try:
+            return proc(*evaluated_args)
+        except TypeError as e:
+            raise LogosEvaluationError(f"Error calling procedure '{op}': {e}")
+    return call
@@ -6,12 +6,12 @@ This environment contains built-in procedures and standard library functions.
 
 import math
 import operator as op
-import functools
 import os
 import time
 import random
 import threading
 from collections import defaultdict
+from types import MappingProxyType
 
 from .types import Symbol, List, Atom
 from .errors import LogosEvaluationError, LogosAssertionError
@@ -31,39 +31,131 @@ def _gensym(prefix: str = "g-") -> Symbol:
         _gensym_counter += 1
         return Symbol(f"{prefix}{_gensym_counter}")
 
-# Thread-safe metrics store
-_metrics = defaultdict(list)
+class MetricSeries:
+    """
+    The samples recorded for a single metric, stored column-wise as parallel
+    lists of timestamps and values instead of one dict per sample. Bulk
+    readers can use the `values` column directly; indexing and iterating
+    still yield {'timestamp': ..., 'value': ...} dicts.
+    """
+    __slots__ = ('timestamps', 'values')
+
+    def __init__(self):
+        self.timestamps = []
+        self.values = []
+
+    def append(self, timestamp, value):
+        self.timestamps.append(timestamp)
+        self.values.append(value)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, index):
+        return {'timestamp': self.timestamps[index], 'value': self.values[index]}
+
+    def __iter__(self):
+        for timestamp, value in zip(self.timestamps, self.values):
+            yield {'timestamp': timestamp, 'value': value}
+
+# Thread-safe metrics store, mapping "category.key" to a MetricSeries.
+# Writers and readers both hold the lock: creating a missing series runs the
+# defaultdict's Python factory, and a sample is two appends (one per
+# column), neither of which is atomic on its own.
+_metrics = defaultdict(MetricSeries)
 _metrics_lock = threading.Lock()
 
 def _record_metric(category, key, value):
+    timestamp = int(time.time() * 1000)
+    name = f"{category}.{key}"
     with _metrics_lock:
-        _metrics[f"{category}.{key}"].append({
-            'timestamp': int(time.time() * 1000),
-            'value': value
-        })
+        _metrics[name].append(timestamp, value)
 
 def _get_metrics_raw():
     with _metrics_lock:
-        # Return a copy to avoid issues with concurrent modification
-        return dict(_metrics)
+        # Return copies, as lists of {'timestamp', 'value'} dicts, so LISP
+        # code sees plain lists and later samples don't leak in.
+        return {name: list(series) for name, series in _metrics.items()}
+
+def _get_metric_values(name):
+    """Returns a copy of the values recorded for a metric, oldest first."""
+    with _metrics_lock:
+        series = _metrics.get(name)
+        return list(series.values) if series is not None else []
+
+def _string_to_number(s):
+    """Converts a string to an int or float, returning False if it isn't numeric."""
+    try:
+        return int(s)
+    except ValueError:
+        try:
+            return float(s)
+        except ValueError:
+            return False
+
+def _list_directory(path):
+    """Returns the names of a directory's entries as a list of symbols."""
+    with os.scandir(path) as entries:
+        return [Symbol(entry.name) for entry in entries]
+
+# Marks a missing binding; unlike None, it can't be a LISP value.
+_MISSING = object()
+
+# Shared by every frame that has no macros of its own. Most frames (each
+# procedure call and `let`) never define one, so they needn't allocate a dict.
+_NO_MACROS = MappingProxyType({})
 
 class Environment(dict):
     """A dictionary with an outer scope and a separate space for macros."""
+    __slots__ = ('outer', 'macros')
+
     def __init__(self, params=(), args=(), outer=None):
         super().__init__()
-        self.update(zip(params, args))
+        if params:
+            self.update(zip(params, args))
         self.outer = outer
         # Macros are stored separately to prevent them from being called as functions.
-        self.macros = {}
+        # The table is read-only until define_macro gives the frame its own.
+        self.macros = _NO_MACROS
+
+    def new_child(self) -> 'Environment':
+        """Creates an empty environment whose outer scope is this one."""
+        return Environment(outer=self)
+
+    def lookup(self, var: Symbol):
+        """
+        Returns the value of a variable from the innermost environment that
+        defines it, walking the scope chain once.
+        """
+        env = self
+        while env is not None:
+            value = env.get(var, _MISSING)
+            if value is not _MISSING:
+                return value
+            env = env.outer
+        raise NameError(f"Symbol '{var}' is not defined.")
+
+    def has(self, var: Symbol) -> bool:
+        """
+        Tells whether a variable is defined in this environment or any
+        enclosing one. Unlike `var in env`, which only looks at this
+        frame, it probes the whole chain, without raising on a miss.
+        """
+        env = self
+        while env is not None:
+            if var in env:
+                return True
+            env = env.outer
+        return False
 
     def find(self, var: Symbol) -> 'Environment':
         """Finds the innermost environment where a variable is defined."""
-        if var in self:
-            return self
-        elif self.outer is not None:
-            return self.outer.find(var)
-        else:
-            raise NameError(f"Symbol '{var}' is not defined.")
+        env = self
+        while env is not None:
+            if var in env:
+                return env
+            env = env.outer
+        raise NameError(f"Symbol '{var}' is not defined.")
 
     def define(self, var, value):
         """Defines a variable in the current environment."""
@@ -72,28 +164,65 @@ class Environment(dict):
 
     def define_macro(self, name, macro):
         """Define a macro in the current environment."""
+        if self.macros is _NO_MACROS:
+            self.macros = {}
         self.macros[name] = macro
 
     def find_macro(self, var: Symbol) -> 'Environment':
         """Finds the innermost environment where a macro is defined."""
-        if var in self.macros:
-            return self
-        elif self.outer is not None:
-            return self.outer.find_macro(var)
-        else:
-            return None # Return None if macro is not found, not an error
-
-from .parser import parse
+        env = self
+        while env is not None:
+            if var in env.macros:
+                return env
+            env = env.outer
+        return None # Return None if macro is not found, not an error
+
+from .parser import parse_file_iter
 from .utils import lisp_str
 
+# Symbols that primitives return on every call are built once up front,
+# rather than looked up in the intern table each time.
+_BEGIN = Symbol('begin')
+_STRING_TYPE = Symbol('string')
+_BOOLEAN_TYPE = Symbol('boolean')
+_NUMBER_TYPE = Symbol('number')
+_LIST_TYPE = Symbol('list')
+_SYMBOL_TYPE = Symbol('symbol')
+_PROCEDURE_TYPE = Symbol('procedure')
+_HASH_MAP_TYPE = Symbol('hash-map')
+_NULL_TYPE = Symbol('null')
+
+def _read_source(filepath):
+    """Reads a source file as a single (begin ...) form of its expressions."""
+    return [_BEGIN, *parse_file_iter(filepath)]
+
+def _assert_equal_batch(pairs):
+    """Checks a list of (actual expected) pairs in one call."""
+    for index, (actual, expected) in enumerate(pairs):
+        if actual != expected:
+            raise LogosAssertionError(f"Assertion {index} Failed: Expected {expected}, but got {actual}")
+    return True
+
+def _add(*args):
+    return sum(args)
+
+def _multiply(*args):
+    return math.prod(args)
+
 def create_global_env(eval_func) -> Environment:
     """Creates and returns the default global environment."""
     env = Environment()
     env.update({
+        # Most primitives on the hot path are C-implemented callables from
+        # `operator` or builtins, so calling them from LISP doesn't push a
+        # Python frame. The variadic `+` and `*` are thin Python wrappers
+        # around sum() and math.prod(); the compiler inlines their common
+        # fixed-arity calls instead.
+
         # Mathematical operators
-        Symbol('+'): lambda *args: sum(args),
+        Symbol('+'): _add,
         Symbol('-'): op.sub,
-        Symbol('*'): lambda *args: functools.reduce(op.mul, args, 1),
+        Symbol('*'): _multiply,
         Symbol('/'): op.truediv,
         Symbol('>'): op.gt,
         Symbol('<'): op.lt,
@@ -108,17 +237,18 @@ def create_global_env(eval_func) -> Environment:
             True if actual == expected
             else (_ for _ in ()).throw(LogosAssertionError(f"Assertion Failed: Expected {expected}, but got {actual}"))
         ),
+        Symbol('assert-equal-batch'): _assert_equal_batch,
         Symbol('abs'): abs,
         Symbol('apply'): lambda proc, args: proc(*args),
-        Symbol('car'): lambda x: x[0],
-        Symbol('cdr'): lambda x: x[1:],
+        Symbol('car'): op.itemgetter(0),
+        Symbol('cdr'): op.itemgetter(slice(1, None)),
         Symbol('cons'): lambda x, y: [x] + y,
         Symbol('eq?'): op.is_,
         Symbol('equal?'): op.eq,
         Symbol('length'): len,
         Symbol('list'): lambda *x: list(x),
         Symbol('list?'): lambda x: isinstance(x, list),
-        Symbol('list-ref'): lambda lst, i: lst[i],
+        Symbol('list-ref'): op.getitem,
         Symbol('list-set!'): lambda lst, i, val: lst.__setitem__(i, val),
         Symbol('map'): lambda proc, lst: list(map(proc, lst)),
         Symbol('max'): max,
@@ -137,16 +267,16 @@ def create_global_env(eval_func) -> Environment:
         Symbol('pi'): math.pi,
 
         # Reflective I/O
-        Symbol('read-source'): lambda filepath: parse(f"(begin {open(filepath).read()})"),
+        Symbol('read-source'): _read_source,
         Symbol('write-source'): lambda filepath, data: open(filepath, 'w').write(lisp_str(data)),
-        Symbol('list-directory'): lambda path: [Symbol(item) for item in os.listdir(path)],
+        Symbol('list-directory'): _list_directory,
 
         # Hash-map functions
         Symbol('hash-get'): lambda h_map, key, default=None: h_map.get(key, default),
         Symbol('hash-set!'): lambda h_map, key, val: h_map.update({key: val}),
         Symbol('hash-count'): len,
         # --- NEW: Needed for Cost Model ---
-        Symbol('hash-contains?'): lambda d, k: k in d,
+        Symbol('hash-contains?'): op.contains,
 
         # Orchestrator Primitives
         Symbol('eval'): lambda ast, env=env: eval_func(ast, env),
@@ -169,6 +299,7 @@ def create_global_env(eval_func) -> Environment:
         # --- NEW: Telemetry Primitives ---
         Symbol('record-metric-raw!'): _record_metric,
         Symbol('get-metrics-raw'): _get_metrics_raw,
+        Symbol('get-metric-values'): _get_metric_values,
 
         # Utility functions
         Symbol('member?'): lambda item, lst: item in lst,
@@ -177,16 +308,18 @@ def create_global_env(eval_func) -> Environment:
         Symbol('print'): print,
         Symbol('sleep'): time.sleep,
         Symbol('string-append'): lambda *args: "".join(map(str, args)),
+        Symbol('string->number'): _string_to_number,
+        Symbol('getenv'): lambda name, default=None: os.environ.get(name, default),
         Symbol('lisp-str'): lisp_str,
         Symbol('type-of'): lambda x: (
-            Symbol('string') if isinstance(x, str) else
-            Symbol('boolean') if isinstance(x, bool) else # bool must be checked before number
-            Symbol('number') if isinstance(x, (int, float)) else
-            Symbol('list') if isinstance(x, list) else
-            Symbol('symbol') if isinstance(x, Symbol) else
-            Symbol('procedure') if callable(x) else
-            Symbol('hash-map') if isinstance(x, dict) else
-            Symbol('null')
+            _STRING_TYPE if isinstance(x, str) else
+            _BOOLEAN_TYPE if isinstance(x, bool) else # bool must be checked before number
+            _NUMBER_TYPE if isinstance(x, (int, float)) else
+            _LIST_TYPE if isinstance(x, list) else
+            _SYMBOL_TYPE if isinstance(x, Symbol) else
+            _PROCEDURE_TYPE if callable(x) else
+            _HASH_MAP_TYPE if isinstance(x, dict) else
+            _NULL_TYPE
         ),
     })
     # 'append' needs to be variadic, so we define it separately.
@@ -5,95 +5,279 @@ into its Abstract Syntax Tree (AST). Because Log-Os is a LISP, the AST
 is simply a nested list of Python objects.
 """
 
+import os
+import pickle
 import re
+import stat
+from functools import lru_cache
 from .errors import LogosSyntaxError
 from .types import Symbol
 
+__all__ = [
+    'tokenize', 'tokenize_iter', 'parse', 'parse_stream', 'parse_stream_iter',
+    'parse_file_iter', 'read_from_tokens', 'atom',
+]
+
+# One precompiled pattern lexes the whole source in a single pass. Each match
+# first swallows any run of leading whitespace with a greedy `\s*`, so long
+# indentation is skipped in one step rather than retried against every
+# alternative one character at a time. Comments match as an ungrouped
+# alternative (yielding '') and are filtered out; since string literals are
+# consumed whole, a ';' inside a string is preserved.
+# The regex for strings `"(?:\\.|[^"\\])*"` handles escaped quotes.
+_TOKEN_RE = re.compile(r'''\s*(?:;[^\n]*|(,@|"(?:\\.|[^"\\])*"|'|`|,|\(|\)|#t|#f|[^\s();]+))?''')
+
+# Maps each reader prefix (e.g. 'x or ,@xs) to the symbol of the form it
+# expands to.
+_QUOTE_SYMBOLS = {
+    "'": Symbol('quote'),
+    '`': Symbol('quasiquote'),
+    ',': Symbol('unquote'),
+    ',@': Symbol('unquote-splicing'),
+}
+
+# Parsed files, keyed by absolute path: (mtime_ns, size) -> frozen ASTs.
+_FILE_CACHE = {}
+
+# Parsed files are also pickled to this directory, next to the source, so
+# later processes can skip tokenizing and reading them, much as Python does
+# with bytecode.
+_PICKLE_DIR = '__pycache__'
+# Stored with each pickle, like a .pyc's magic number. Bump it whenever a
+# change to the tokenizer or reader alters the ASTs a source file parses to,
+# so pickles from older versions are ignored.
+_PICKLE_FORMAT = 1
+
+class _ASTUnpickler(pickle.Unpickler):
+    """
+    Unpickles frozen ASTs, refusing anything but the builtin atoms, tuples
+    and Symbol, so a corrupt or foreign pickle can't run Python code. (It
+    could still hold any LISP forms; see `_is_private`.)
+    """
+    def find_class(self, module, name):
+        if module == Symbol.__module__ and name == Symbol.__qualname__:
+            return Symbol
+        raise pickle.UnpicklingError(f"{module}.{name} is not allowed in a parsed-file cache")
+
+_DIGITS = frozenset('0123456789')
+_DIGITS_OR_DOT = _DIGITS | {'.'}
+
+def tokenize_iter(source_code: str):
+    """
+    Lazily yields the tokens of the source code one at a time,
+    dropping comments along the way.
+    """
+    for match in _TOKEN_RE.finditer(source_code):
+        token = match.group(1)
+        if token:
+            yield token
+
 def tokenize(source_code: str) -> list:
     """
-    Splits the source code into a list of tokens using a robust regex
-    that correctly handles escaped characters within strings.
+    Splits the source code into a list of tokens.
     """
-    source_code = '\n'.join(line.split(';', 1)[0] for line in source_code.splitlines())
-    # The regex for strings `"(?:\\.|[^"\\])*"` handles escaped quotes,
-    # preventing the tokenizer from splitting strings containing special characters.
-    token_regex = r',@|"(?:\\.|[^"\\])*"|\'|`|,|\(|\)|#t|#f|[^\s\(\)]+'
-    return re.findall(token_regex, source_code)
+    # findall collects every match's token in C; comments and trailing
+    # whitespace match as '' and are dropped.
+    return list(filter(None, _TOKEN_RE.findall(source_code)))
 
 def parse(source_code: str):
     """
     Parses a string of Log-Os source code into a single expression (AST).
+    Results are memoized per source string; every call returns a fresh
+    copy of the AST, so callers are free to mutate it.
     """
+    return _thaw(_parse_frozen(source_code))
+
+@lru_cache(maxsize=4096)
+def _parse_frozen(source_code: str):
+    """Parses source code into an immutable, tuple-based AST for caching."""
     tokens = tokenize(source_code)
     if not tokens:
         raise LogosSyntaxError("Source code is empty or contains only comments.")
 
+    tokens.reverse()
     ast = read_from_tokens(tokens)
     if tokens:
-        raise LogosSyntaxError(f"Unexpected tokens after main expression: {tokens}")
-    return ast
+        raise LogosSyntaxError(f"Unexpected tokens after main expression: {tokens[::-1]}")
+    return _freeze(ast)
+
+def _freeze(x):
+    """Recursively converts the lists of an AST into tuples."""
+    return tuple(map(_freeze, x)) if isinstance(x, list) else x
+
+def _thaw(x):
+    """Recursively converts the tuples of a frozen AST back into lists."""
+    return list(map(_thaw, x)) if isinstance(x, tuple) else x
 
 def read_from_tokens(tokens: list):
     """
-    Recursively reads an expression from a list of tokens.
+    Recursively reads an expression from a list of tokens. The list is
+    expected in reverse order, so each token is popped off its end in
+    constant time; consumed tokens are removed from the list.
     """
     if not tokens:
         raise LogosSyntaxError("Unexpected EOF while reading tokens.")
 
-    token = tokens.pop(0)
+    token = tokens.pop()
 
-    if token == "'":
-        return [Symbol('quote'), read_from_tokens(tokens)]
-    elif token == '`':
-        return [Symbol('quasiquote'), read_from_tokens(tokens)]
-    elif token == ',':
-        return [Symbol('unquote'), read_from_tokens(tokens)]
-    elif token == ',@':
-        return [Symbol('unquote-splicing'), read_from_tokens(tokens)]
+    quote_symbol = _QUOTE_SYMBOLS.get(token)
+    if quote_symbol is not None:
+        return [quote_symbol, read_from_tokens(tokens)]
     elif token == '(':
+        # Bind hot attribute lookups to locals for the element loop.
         L = []
-        while tokens and tokens[0] != ')':
-            L.append(read_from_tokens(tokens))
+        append = L.append
+        while tokens and tokens[-1] != ')':
+            append(read_from_tokens(tokens))
 
         if not tokens:
             raise LogosSyntaxError("Unexpected EOF: missing ')'")
 
-        tokens.pop(0)  # Pop off the closing ')'
+        tokens.pop()  # Pop off the closing ')'
         return L
     elif token == ')':
         raise LogosSyntaxError("Unexpected ')' encountered.")
     else:
         return atom(token)
 
+def parse_stream_iter(source_code: str):
+    """
+    Lazily parses a string of Log-Os source code containing multiple
+    expressions, yielding one AST at a time. Only the tokens of the
+    expression currently being read are held in memory, so callers can
+    evaluate each expression before the next one is parsed.
+    """
+    tokens = []
+    depth = 0
+    for token in tokenize_iter(source_code):
+        tokens.append(token)
+        if token == '(':
+            depth += 1
+        elif token == ')':
+            depth -= 1
+        # A complete expression has balanced parens and doesn't end on a
+        # reader prefix that still expects the quoted expression to follow.
+        if depth <= 0 and token not in _QUOTE_SYMBOLS:
+            tokens.reverse()
+            yield read_from_tokens(tokens)
+            depth = 0
+    if tokens:
+        # Leftover tokens mean an unclosed expression; let the reader report it.
+        tokens.reverse()
+        read_from_tokens(tokens)
+
+def _pickle_path(path: str) -> str:
+    directory, name = os.path.split(path)
+    return os.path.join(directory, _PICKLE_DIR, name + '.pkl')
+
+def _is_private(st) -> bool:
+    """
+    Tells whether a file or directory, by its stat result, belongs to this
+    user and can't be written by anyone else. A pickle someone else could
+    have planted (e.g. beside a file in /tmp) is never trusted: its forms
+    would be run in place of the source's.
+    """
+    getuid = getattr(os, 'getuid', None)
+    if getuid is not None and st.st_uid != getuid():
+        return False
+    return not st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+def _load_pickled_forms(path: str, key):
+    """Returns the pickled, frozen ASTs of a file if they match its key."""
+    pickle_path = _pickle_path(path)
+    try:
+        if not _is_private(os.stat(os.path.dirname(pickle_path))):
+            return None
+        with open(pickle_path, 'rb') as f:
+            if not _is_private(os.fstat(f.fileno())):
+                return None
+            pickled_key, forms = _ASTUnpickler(f).load()
+    except (OSError, EOFError, ValueError, TypeError, pickle.UnpicklingError):
+        return None
+    if pickled_key != (_PICKLE_FORMAT, key) or not isinstance(forms, tuple):
+        return None
+    return forms
+
+def _dump_pickled_forms(path: str, key, forms):
+    """Pickles the frozen ASTs of a file, if its cache directory is private."""
+    pickle_path = _pickle_path(path)
+    # Write to a private file first so concurrent readers never see a
+    # partial pickle.
+    temp_path = f"{pickle_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(pickle_path), exist_ok=True)
+        if not _is_private(os.stat(os.path.dirname(pickle_path))):
+            return
+        with open(temp_path, 'wb') as f:
+            pickle.dump(((_PICKLE_FORMAT, key), forms), f, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, pickle_path)
+    except OSError:
+        pass
+
+def parse_file_iter(filepath: str):
+    """
+    Lazily parses a Log-Os source file, returning an iterator over its
+    ASTs. The file is found and read when this is called, so a missing
+    file raises FileNotFoundError here rather than while the caller is
+    evaluating its forms. Parsed forms are cached per file and
+    revalidated against its mtime and size, so a file loaded repeatedly
+    is only read and parsed once; each call yields fresh copies of the
+    cached ASTs. The cache is also pickled to a `__pycache__` directory
+    beside the file, and reused from there by later processes.
+    """
+    path = os.path.abspath(filepath)
+    stat = os.stat(path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _FILE_CACHE.get(path)
+    forms = cached[1] if cached is not None and cached[0] == key else None
+    if forms is None:
+        forms = _load_pickled_forms(path, key)
+        if forms is not None:
+            _FILE_CACHE[path] = (key, forms)
+    if forms is not None:
+        return map(_thaw, forms)
+
+    with open(path) as f:
+        source = f.read()
+    return _parse_and_cache(source, path, key)
+
+def _parse_and_cache(source: str, path: str, key):
+    """Yields the ASTs of a file's source, caching them once all are read."""
+    forms = []
+    for ast in parse_stream_iter(source):
+        # Freeze before yielding, since the caller may mutate the AST.
+        forms.append(_freeze(ast))
+        yield ast
+    forms = tuple(forms)
+    _FILE_CACHE[path] = (key, forms)
+    _dump_pickled_forms(path, key, forms)
+
 def parse_stream(source_code: str) -> list:
     """
     Parses a string of Log-Os source code containing multiple expressions
     into a list of ASTs.
     """
-    tokens = tokenize(source_code)
-    if not tokens:
-        return []
-
-    asts = []
-    while tokens:
-        asts.append(read_from_tokens(tokens))
-    return asts
+    return list(parse_stream_iter(source_code))
 
 def atom(token: str):
     """
     Converts a token to its appropriate Python type.
     """
-    if token.startswith('"') and token.endswith('"'):
+    first = token[0]
+    if first == '"' and token.endswith('"'):
         return token[1:-1]
     elif token == '#t':
         return True
     elif token == '#f':
         return False
-    else:
+    # Only attempt numeric conversion when the token can start a number, so
+    # the common symbol case never pays for raising and catching ValueError.
+    elif first in _DIGITS or (first in '+-.' and len(token) > 1 and token[1] in _DIGITS_OR_DOT):
         try:
             return int(token)
         except ValueError:
             try:
                 return float(token)
             except ValueError:
-                return Symbol(token)
\ No newline at end of file
+                pass
+    return Symbol(token)
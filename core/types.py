@@ -3,17 +3,45 @@
 Defines the core data types used within the Log-Os interpreter.
 """
 
+import weakref
+
+# Intern table mapping names to their canonical Symbol instance. Values are
+# held weakly so that symbols nothing refers to anymore (e.g. from gensym)
+# don't accumulate for the lifetime of the process.
+_SYMBOL_POOL = weakref.WeakValueDictionary()
+
 class Symbol(str):
-    """A LISP-style symbol, which is a distinct type from a string."""
+    """
+    A LISP-style symbol, which is a distinct type from a string.
+    Symbols are interned, so two symbols with the same name are the same
+    object and can be compared with `is`.
+    """
+    # No per-instance __dict__; the weakref slot lets the intern table
+    # hold symbols weakly.
+    __slots__ = ('__weakref__',)
+
     # A unique object to mark lists that need to be spliced.
     SPLICE = object()
 
+    def __new__(cls, name):
+        symbol = _SYMBOL_POOL.get(name)
+        if symbol is None:
+            symbol = _SYMBOL_POOL.setdefault(name, super().__new__(cls, name))
+        return symbol
+
+    def __reduce__(self):
+        # Re-intern on unpickling/copying instead of bypassing __new__.
+        return (Symbol, (str(self),))
+
 class Macro:
     """Represents a macro, holding its parameters and body."""
+    __slots__ = ('params', 'body', 'env', 'code')
+
     def __init__(self, params, body, env):
         self.params = params
         self.body = body
         self.env = env # The environment where the macro was defined
+        self.code = None # The compiled body, set by the compiler
 
 # An Atom is a Symbol, a number, a boolean, a string, or a hash-map.
 Atom = (Symbol, int, float, str, bool, dict)
@@ -1,7 +1,8 @@
 # repl.py
+import os
 import sys
-from core.parser import parse, parse_stream
-from core.interpreter import evaluate
+from core.parser import parse
+from core.interpreter import evaluate, load_file
 from core.environment import create_global_env
 from core.errors import LogosError
 from core.utils import lisp_str
@@ -14,14 +15,14 @@ def main():
     core_files = ["kernel.l0", "core/evaluators.l0", "core/orchestrator.l0", "stdlib/core.l0"]
     try:
         for core_file in core_files:
-            with open(core_file) as f:
-                source = f.read()
-            asts = parse_stream(source)
-            for ast in asts:
-                evaluate(ast, global_env)
+            load_file(core_file, global_env)
             print(f"Loaded {core_file}.")
     except FileNotFoundError as e:
-        print(f"Warning: {e.filename} not found. Language may be in a degraded state.")
+        if e.filename != os.path.abspath(core_file):
+            # The core file exists, but something it reads doesn't.
+            print(f"FATAL: Error loading core file {core_file}: {e.filename} not found.")
+            return
+        print(f"Warning: {core_file} not found. Language may be in a degraded state.")
     except LogosError as e:
         print(f"FATAL: Error loading core file: {e}")
         return
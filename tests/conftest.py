@@ -1,31 +1,48 @@
 import pytest
 from core.environment import create_global_env
-from core.interpreter import evaluate
-from core.parser import parse, parse_stream
+from core.interpreter import evaluate, load_file
 from core.errors import LogosError
 
-@pytest.fixture(scope="function")
-def global_env():
+KERNEL_PATH = "kernel.l0"
+
+@pytest.fixture(scope="session")
+def base_global_env():
     """
-    Provides a global environment with the kernel pre-loaded.
-    This fixture ensures that macros like 'let' and 'cond' are available
-    for tests that need them.
+    A global environment with the kernel pre-loaded, built once per session.
+    Tests should use `global_env`, which scopes their definitions to a child.
     """
     # The 'evaluate' function is now passed to create the environment
     # to break a circular dependency.
     env = create_global_env(evaluate)
 
-    # Load the kernel to make macros available for testing
+    # Load the kernel to make macros available for testing. The parser
+    # caches its ASTs, in memory and pickled under __pycache__, so it is
+    # only re-parsed when it changes.
     try:
-        with open("kernel.l0") as f:
-            source = f.read()
-        asts = parse_stream(source)
-        for ast in asts:
-            evaluate(ast, env)
-
+        load_file(KERNEL_PATH, env)
     except FileNotFoundError:
         pytest.fail("FATAL: kernel.l0 not found during test setup. The kernel is required for tests to run.")
     except LogosError as e:
         pytest.fail(f"FATAL: Error loading kernel.l0 during test setup: {e}")
 
-    return env
\ No newline at end of file
+    return env
+
+@pytest.fixture(scope="function")
+def global_env(base_global_env):
+    """
+    Provides a global environment with the kernel pre-loaded.
+    This fixture ensures that macros like 'let' and 'cond' are available
+    for tests that need them.
+
+    Each test gets a fresh child of the shared session environment.
+    Anything a test defines directly in the shared environment (e.g. via
+    defvar, which always binds globally) is removed afterwards so tests
+    stay independent.
+    """
+    base_vars = set(base_global_env)
+    base_macros = set(base_global_env.macros)
+    yield base_global_env.new_child()
+    for name in set(base_global_env) - base_vars:
+        del base_global_env[name]
+    for name in set(base_global_env.macros) - base_macros:
+        del base_global_env.macros[name]
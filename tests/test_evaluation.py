@@ -1,10 +1,13 @@
 # tests/test_evaluation.py
 
 import pytest
-from core.interpreter import evaluate
-from core.environment import create_global_env, _metrics, _metrics_lock, L0_CACHE
-from core.parser import parse, parse_stream
+from collections import deque
+from itertools import repeat
+from core.interpreter import evaluate, load_file
+from core.environment import _metrics, _metrics_lock, _record_metric, L0_CACHE
+from core.parser import parse, parse_stream_iter
 from core.types import Symbol
+import threading
 import time
 
 @pytest.fixture(autouse=True)
@@ -13,47 +16,52 @@ def test_setup_teardown():
     Fixture to set up and tear down the environment for each test.
     It clears metrics, caches, and other global state to ensure test isolation.
     """
-    with _metrics_lock:
-        _metrics.clear()
-    L0_CACHE.clear()
+    # Most tests record nothing, so skip the lock and the clears when the
+    # stores are already empty.
+    if _metrics:
+        with _metrics_lock:
+            _metrics.clear()
+    if L0_CACHE:
+        L0_CACHE.clear()
     # Resetting the environment for each test is crucial for isolation.
     yield
 
 @pytest.fixture
-def lisp_eval_env():
+def lisp_eval_env(global_env):
     """
     Provides a LISP evaluation function and its corresponding environment,
     with kernel.l0 pre-loaded.
     """
-    env = create_global_env(evaluate)
+    env = global_env
 
     # Define an evaluation function that uses this specific environment
     def evaluator(ast):
         return evaluate(ast, env)
 
-    # Load kernel, which is foundational for almost all LISP code.
-    with open("kernel.l0", 'r') as f:
-        source = f.read()
-        asts = parse_stream(source)
-        for ast in asts:
-            evaluator(ast)
-
     return evaluator, env
 
-def run_lisp_file(lisp_eval, filepath: str):
+def run_lisp_file(env, filepath: str):
     """Helper function to load and evaluate a LISP file."""
-    ast = parse(f'(load "{filepath}")')
-    lisp_eval(ast)
+    load_file(filepath, env)
+
+def run_lisp_files(env, *filepaths: str):
+    """
+    Helper function to load several LISP files as one concatenated source,
+    so they go through a single parse stream.
+    """
+    sources = []
+    for filepath in filepaths:
+        with open(filepath) as f:
+            sources.append(f.read())
+    deque(map(evaluate, parse_stream_iter("\n".join(sources)), repeat(env)), maxlen=0)
 
-def test_contracts_l0(lisp_eval_env):
+def test_contracts_l0(global_env):
     """Tests the contracts system by running the LISP test suite."""
-    lisp_eval, env = lisp_eval_env
-    run_lisp_file(lisp_eval, "tests/test_contracts.l0")
+    run_lisp_file(global_env, "tests/test_contracts.l0")
 
-def test_multimethods_l0_success(lisp_eval_env):
+def test_multimethods_l0_success(global_env):
     """Tests the multimethod system's success cases by running the LISP test file."""
-    lisp_eval, env = lisp_eval_env
-    run_lisp_file(lisp_eval, "tests/test_multimethods.l0")
+    run_lisp_file(global_env, "tests/test_multimethods.l0")
 
 def test_multimethods_l0_error_on_no_method(lisp_eval_env):
     """
@@ -63,8 +71,8 @@ def test_multimethods_l0_error_on_no_method(lisp_eval_env):
     lisp_eval, env = lisp_eval_env
 
     # Load the multimethods library and the test file which defines the 'report-type' multimethod.
-    run_lisp_file(lisp_eval, "stdlib/multimethods.l0")
-    run_lisp_file(lisp_eval, "tests/test_multimethods.l0")
+    run_lisp_file(env, "stdlib/multimethods.l0")
+    run_lisp_file(env, "tests/test_multimethods.l0")
 
     # Call 'report-type' with a boolean (for which no method is defined).
     result = lisp_eval(parse("(report-type #f)"))
@@ -80,10 +88,10 @@ def test_stdlib_l0(lisp_eval_env):
     lisp_eval, env = lisp_eval_env
 
     # Load the new systems one by one to isolate any syntax errors.
-    run_lisp_file(lisp_eval, "stdlib/contracts.l0")
-    run_lisp_file(lisp_eval, "stdlib/multimethods.l0")
+    run_lisp_file(env, "stdlib/contracts.l0")
+    run_lisp_file(env, "stdlib/multimethods.l0")
     # This is the file that defines 'count'.
-    run_lisp_file(lisp_eval, "stdlib/collections.l0")
+    run_lisp_file(env, "stdlib/collections.l0")
 
     # Get a handle to the LISP 'count' function.
     count_fn = lisp_eval(Symbol('count'))
@@ -98,6 +106,69 @@ def test_stdlib_l0(lisp_eval_env):
     assert count_fn(test_map) == 2
     assert count_fn({}) == 0
 
+def test_getenv_and_string_to_number(lisp_eval_env, monkeypatch):
+    lisp_eval, env = lisp_eval_env
+    monkeypatch.setenv("LOGOS_TEST_VAR", "value")
+    monkeypatch.delenv("LOGOS_UNSET_VAR", raising=False)
+    assert lisp_eval(parse('(getenv "LOGOS_TEST_VAR")')) == "value"
+    assert lisp_eval(parse('(getenv "LOGOS_UNSET_VAR")')) is None
+    assert lisp_eval(parse('(getenv "LOGOS_UNSET_VAR" "fallback")')) == "fallback"
+    assert lisp_eval(parse('(string->number "42")')) == 42
+    assert lisp_eval(parse('(string->number "2.5")')) == 2.5
+    assert lisp_eval(parse('(string->number "abc")')) is False
+
+@pytest.mark.parametrize("override,expected", [(None, 50.0), ("7.5", 7.5), ("0", 0), ("abc", 50.0)])
+def test_jit_threshold_override(lisp_eval_env, monkeypatch, override, expected):
+    lisp_eval, env = lisp_eval_env
+    if override is None:
+        monkeypatch.delenv("LOGOS_JIT_THRESHOLD", raising=False)
+    else:
+        monkeypatch.setenv("LOGOS_JIT_THRESHOLD", override)
+    run_lisp_file(env, "stdlib/tuning.l0")
+    threshold = lisp_eval(parse("(default-jit-threshold)"))
+    assert threshold == expected and type(threshold) is type(expected)
+
+def test_get_metric_stats(lisp_eval_env):
+    """Tests that telemetry stats are computed from the recorded metric values."""
+    lisp_eval, env = lisp_eval_env
+    run_lisp_file(env, "stdlib/telemetry.l0")
+
+    assert lisp_eval(parse("(get-metric-stats 'eval 'time-ms)")) == {'mean': 0, 'count': 0}
+
+    lisp_eval(parse("(record-metric! 'eval 'time-ms 3)"))
+    lisp_eval(parse("(record-metric! 'eval 'time-ms 5)"))
+    assert lisp_eval(parse("(get-metric-stats 'eval 'time-ms)")) == {'mean': 4.0, 'count': 2}
+
+def test_get_metrics_raw_returns_plain_lists(lisp_eval_env):
+    """Raw metrics are copied out as lists of {'timestamp', 'value'} dicts."""
+    lisp_eval, env = lisp_eval_env
+    run_lisp_file(env, "stdlib/telemetry.l0")
+    lisp_eval(parse("(record-metric! 'eval 'time-ms 3)"))
+    lisp_eval(parse("(defvar raw (get-metrics-raw))"))
+    assert lisp_eval(parse("(list? (hash-get raw \"eval.time-ms\"))")) is True
+    samples = lisp_eval(parse("(hash-get raw \"eval.time-ms\")"))
+    assert [sample['value'] for sample in samples] == [3]
+
+    # Later samples don't show up in an earlier copy.
+    lisp_eval(parse("(record-metric! 'eval 'time-ms 5)"))
+    assert len(lisp_eval(parse("(hash-get raw \"eval.time-ms\")"))) == 1
+
+def test_record_metric_from_many_threads():
+    """Concurrent writers, even to new metrics, must not lose or misalign samples."""
+    def record(thread_id):
+        for i in range(2000):
+            _record_metric('thread', f"{thread_id}-{i % 500}", i)
+    threads = [threading.Thread(target=record, args=(t,)) for t in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    with _metrics_lock:
+        series = [s for name, s in _metrics.items() if name.startswith('thread.')]
+        assert len(series) == 8 * 500
+        assert sum(len(s.values) for s in series) == 8 * 2000
+        assert all(len(s.timestamps) == len(s.values) for s in series)
+
 def test_synapse_adaptive_behavior_directly(lisp_eval_env):
     """
     Tests the Project Synapse feedback loop by directly calling LISP functions from Python.
@@ -106,21 +177,25 @@ def test_synapse_adaptive_behavior_directly(lisp_eval_env):
     lisp_eval, env = lisp_eval_env
 
     # Load Synapse-specific libraries
-    for filepath in ["stdlib/telemetry.l0", "stdlib/cost-model.l0", "stdlib/tuning.l0", "core/lisp/aware-evaluator.l0"]:
-         run_lisp_file(lisp_eval, filepath)
+    run_lisp_files(env, "stdlib/telemetry.l0", "stdlib/cost-model.l0", "stdlib/tuning.l0", "core/lisp/aware-evaluator.l0")
 
     # 1. --- Get handles to the LISP functions we need to call ---
     compose_evaluator_fn = lisp_eval(Symbol('compose-aware-evaluator'))
     update_threshold_fn = lisp_eval(Symbol('update-threshold!'))
-    get_metric_stats_fn = lisp_eval(Symbol('get-metric-stats'))
 
     # 2. --- Compose the Aware Evaluator ---
     aware_evaluator = compose_evaluator_fn()
 
     # 3. --- Define the simulated workload in Python ---
     # This is the equivalent of the (heavy-work) LISP function
+    # Busy-waits on the CPU for 20ms. Unlike a sleep, it isn't subject to
+    # scheduler wake-up jitter, and unlike a fixed iteration count, it takes
+    # the same time on fast and slow machines.
     def heavy_work_py():
-        time.sleep(0.02)
+        end = time.perf_counter() + 0.02
+        x = 0
+        while time.perf_counter() < end:
+            x += 1
         return 42
 
     # This is the equivalent of the 'heavy-task' AST hash-map
@@ -130,12 +205,15 @@ def test_synapse_adaptive_behavior_directly(lisp_eval_env):
     }
 
     # 4. --- First Run (Cold Start) ---
+    # Pin the threshold rather than relying on the default, which can be
+    # overridden via LOGOS_JIT_THRESHOLD.
+    update_threshold_fn(Symbol('jit-threshold'), 50.0)
     # The cost model should use its default prediction, resulting in a 'baseline' run.
     aware_evaluator(heavy_task_ast, env)
 
     # Assert that the evaluation mode was 'baseline'
     with _metrics_lock:
-        eval_modes = [m['value'] for m in _metrics.get('eval.mode', [])]
+        eval_modes = _metrics['eval.mode'].values
         assert eval_modes == ['baseline'], f"First run should be 'baseline', but got {eval_modes}"
 
     # 5. --- Tune the System ---
@@ -150,11 +228,10 @@ def test_synapse_adaptive_behavior_directly(lisp_eval_env):
     # 7. --- Final Assertions ---
     # Check that the full sequence of evaluation modes is correct and that JIT was triggered.
     with _metrics_lock:
-        eval_modes = [m['value'] for m in _metrics.get('eval.mode', [])]
+        eval_modes = _metrics['eval.mode'].values
         assert eval_modes == ['baseline', 'jit'], \
             f"Expected evaluation modes to be ['baseline', 'jit'], but got {eval_modes}"
 
-        jit_compiles = _metrics.get('jit.compiled', [])
-        assert len(jit_compiles) == 1, \
-            f"Expected exactly one JIT compilation, but found {len(jit_compiles)}"
-        assert jit_compiles[0]['value'] == 1
\ No newline at end of file
+        jit_compiles = _metrics['jit.compiled'].values
+        assert jit_compiles == [1], \
+            f"Expected exactly one JIT compilation, but found {jit_compiles}"
\ No newline at end of file
@@ -0,0 +1,170 @@
+# tests/test_interpreter.py
+
+import pytest
+from core.interpreter import evaluate
+from core.parser import parse
+from core.types import Symbol
+from core.errors import LogosError, LogosEvaluationError, LogosAssertionError
+
+# Single-expression programs and the values they evaluate to.
+CASES = [
+    ("42", 42),
+    ('"text"', "text"),
+    ("(+ 2 3)", 5),
+    ("(- 10 4)", 6),
+    ("(* (+ 2 3) 4)", 20),
+    ("(/ 9 2)", 4.5),
+    ("(% 7 3)", 1),
+    ("(if (> 5 3) 1 2)", 1),
+    ("(if (< 5 3) 1 2)", 2),
+    ("(if #f 1)", None),
+    ("(if #f (if) 2)", 2),
+    ("(and #t 1)", 1),
+    ("(and 1 #f (undefined-symbol))", False),
+    ("(or #f 2)", True),
+    ("(or #f #f)", False),
+    ("(or 1 (undefined-symbol))", True),
+    ("(and)", True),
+    ("(and 1 2 3)", 3),
+    ("(and 1 2 3 0)", False),
+    ("(or)", False),
+    ("(or #f 0)", 0),
+    ("(or #f #f #f 4)", True),
+    ("(begin 1 2 3)", 3),
+    ("(quote (a b))", [Symbol('a'), Symbol('b')]),
+    ("`(1 ,(+ 1 1) 3)", [1, 2, 3]),
+    ("`(1 ,@(list 2 3) 4)", [1, 2, 3, 4]),
+    ("`(1 (2 ,(+ 1 2)) ,@(list 4 5) 6 7)", [1, [2, 3], 4, 5, 6, 7]),
+    ("`(a `(b ,(c ,(+ 1 2))))",
+     [Symbol('a'), [Symbol('quasiquote'), [Symbol('b'), [Symbol('unquote'), [Symbol('c'), 3]]]]]),
+    ("((lambda (x y) (* x y)) 3 4)", 12),
+    ("((lambda (x . rest) rest) 1 2 3)", [2, 3]),
+    ("(let ((x 2) (y 3)) (* x y))", 6),
+    ("(let* ((x 2) (y (+ x 1))) (* x y))", 6),
+    ("(unless #f 7)", 7),
+    ("(hash-get (hash-map 'a 1) 'a)", 1),
+    ('(try (error "boom") (catch e e))', "boom"),
+]
+
+# Parse every case once at import rather than inside each test.
+PARSED = [(parse(source), expected) for source, expected in CASES]
+
+@pytest.mark.parametrize("ast,expected", PARSED, ids=[source for source, _ in CASES])
+def test_eval_expression(ast, expected, global_env):
+    assert evaluate(ast, global_env) == expected
+
+def test_eval_defun_and_recursion(global_env):
+    evaluate(parse("(defun fact (n) (if (< n 2) 1 (* n (fact (- n 1)))))"), global_env)
+    assert evaluate(parse("(fact 10)"), global_env) == 3628800
+
+def test_eval_tail_calls_run_in_constant_stack(global_env):
+    evaluate(parse("(defun count-down (n) (if (< n 1) 'done (count-down (- n 1))))"), global_env)
+    evaluate(parse("(defun even? (n) (if (= n 0) #t (odd? (- n 1))))"), global_env)
+    evaluate(parse("(defun odd? (n) (if (= n 0) #f (even? (- n 1))))"), global_env)
+    assert evaluate(parse("(count-down 10000)"), global_env) == Symbol('done')
+    assert evaluate(parse("(even? 10001)"), global_env) is False
+
+def test_eval_non_tail_recursion_depth(global_env):
+    # Calls outside tail position still use the Python stack; each level
+    # must cost few enough frames to recurse this deep.
+    evaluate(parse("(defun sum-to (n) (if (= n 0) 0 (+ n (sum-to (- n 1)))))"), global_env)
+    assert evaluate(parse("(sum-to 150)"), global_env) == 11325
+
+def test_eval_defun_pure_caches_results(global_env):
+    evaluate(parse("(defvar calls (hash-map 'n 0))"), global_env)
+    evaluate(parse("(defun-pure square (r) (hash-set! calls 'n (+ (hash-get calls 'n) 1)) (* r r))"), global_env)
+    assert [evaluate(parse(f"(square {r})"), global_env) for r in (3, 3, 4, 3, 4)] == [9, 9, 16, 9, 16]
+    assert evaluate(parse("(hash-get calls 'n)"), global_env) == 2
+
+def test_eval_rebound_operator(global_env):
+    evaluate(parse("(defun shadow (+ x) (+ x x))"), global_env)
+    assert evaluate(parse("(shadow list 2)"), global_env) == [2, 2]
+    with pytest.raises(LogosEvaluationError):
+        evaluate(parse('(+ "a" "b")'), global_env)
+
+def test_eval_quasiquote_builds_fresh_lists(global_env):
+    evaluate(parse("(defun template () `(1 (2 3)))"), global_env)
+    first = evaluate(parse("(template)"), global_env)
+    first[1][0] = 'changed'
+    assert evaluate(parse("(template)"), global_env) == [1, [2, 3]]
+
+def test_eval_macro_redefinition_reexpands(global_env):
+    evaluate(parse("(defmacro twice (x) `(list ,x ,x))"), global_env)
+    evaluate(parse("(defun use-twice () (twice 1))"), global_env)
+    assert evaluate(parse("(use-twice)"), global_env) == [1, 1]
+    assert evaluate(parse("(use-twice)"), global_env) == [1, 1]
+    evaluate(parse("(defmacro twice (x) `(list ,x ,x ,x))"), global_env)
+    assert evaluate(parse("(use-twice)"), global_env) == [1, 1, 1]
+
+def test_eval_macro_expands_once_per_call_site(global_env):
+    evaluate(parse("(defvar expansions (hash-map))"), global_env)
+    evaluate(parse("(hash-set! expansions 'n 0)"), global_env)
+    evaluate(parse(
+        "(defmacro fresh-name () "
+        "(hash-set! expansions 'n (+ (hash-get expansions 'n) 1)) "
+        "`(quote ,(gensym)))"), global_env)
+    evaluate(parse("(defun name-of () (fresh-name))"), global_env)
+    names = [evaluate(parse("(name-of)"), global_env) for _ in range(3)]
+    assert evaluate(parse("(hash-get expansions 'n)"), global_env) == 1
+    assert names[0] is names[1] is names[2]
+
+def test_eval_defun_pure_keys_on_argument_types(global_env):
+    evaluate(parse("(defun-pure ident (x) x)"), global_env)
+    results = [evaluate(parse(f"(ident {arg})"), global_env) for arg in ("1", "1.0", "#t", "'a", '"a"')]
+    assert [type(result) for result in results] == [int, float, bool, Symbol, str]
+    evaluate(parse("(defun-pure tp (x) (type-of x))"), global_env)
+    assert evaluate(parse("(tp 1)"), global_env) == Symbol('number')
+    assert evaluate(parse("(tp #t)"), global_env) == Symbol('boolean')
+
+@pytest.mark.parametrize("operands", ["0.1 0.2 0.3", "1e16 1.0 -1e16", "0.1 0.2"])
+def test_eval_inlined_addition_matches_sum(global_env, operands):
+    # sum() (and so `+`) sums floats with compensation on Python 3.12+;
+    # inlined calls must agree with calling the primitive via apply.
+    inlined = evaluate(parse(f"(+ {operands})"), global_env)
+    applied = evaluate(parse(f"(apply + '({operands}))"), global_env)
+    assert inlined == applied == sum(float(x) for x in operands.split())
+
+def test_eval_defvar_binds_globally_once(global_env):
+    evaluate(parse("(defun setup () (defvar counter 1))"), global_env)
+    evaluate(parse("(setup)"), global_env)
+    assert evaluate(parse("(defvar counter 2)"), global_env) == 1
+    assert Symbol('counter') in global_env.outer
+
+def test_environment_has_probes_the_scope_chain(global_env):
+    assert global_env.has(Symbol('car'))
+    assert Symbol('car') not in global_env
+    assert not global_env.has(Symbol('undefined-symbol'))
+
+def test_eval_undefined_symbol(global_env):
+    with pytest.raises(LogosEvaluationError):
+        evaluate(parse("undefined-symbol"), global_env)
+
+def test_eval_procedure_arity_error(global_env):
+    with pytest.raises(LogosEvaluationError):
+        evaluate(parse("((lambda (x) x) 1 2)"), global_env)
+
+def test_eval_assert_equal_batch(global_env):
+    assert evaluate(parse("(assert-equal-batch (list (list (+ 1 1) 2) (list (car '(a)) 'a)))"), global_env) is True
+    with pytest.raises(LogosAssertionError, match="Assertion 1 Failed"):
+        evaluate(parse("(assert-equal-batch (list (list 1 1) (list 2 3) (list 4 5)))"), global_env)
+
+def test_eval_load_reports_only_its_own_file_missing(global_env, tmp_path):
+    with pytest.raises(LogosError, match="File not found"):
+        evaluate(parse(f'(load "{tmp_path / "missing.l0"}")'), global_env)
+
+    missing = tmp_path / "does-not-exist.l0"
+    outer = tmp_path / "outer.l0"
+    outer.write_text(f'(read-source "{missing}")')
+    with pytest.raises(FileNotFoundError) as excinfo:
+        evaluate(parse(f'(load "{outer}")'), global_env)
+    assert excinfo.value.filename == str(missing)
+
+def test_eval_list_directory(global_env):
+    entries = evaluate(parse('(list-directory "core")'), global_env)
+    assert isinstance(entries, list)
+    assert any(entry is Symbol('interpreter.py') for entry in entries)
+
+def test_eval_read_source(global_env):
+    source = evaluate(parse('(read-source "tests/load_sample.l0")'), global_env)
+    assert source[0] == Symbol('begin')
+    assert [form[0] for form in source[1:]] == [Symbol('defvar'), Symbol('defun')]
@@ -1,7 +1,10 @@
 # tests/test_parser.py
 
 import pytest
-from core.parser import parse
+import os
+import pickle
+from core import parser
+from core.parser import tokenize, parse, parse_stream, parse_stream_iter, parse_file_iter
 from core.types import Symbol
 from core.errors import LogosSyntaxError
 
@@ -42,4 +45,115 @@ def test_parse_syntax_error_unexpected_paren():
 
 def test_parse_syntax_error_unclosed_paren():
     with pytest.raises(LogosSyntaxError):
-        parse("(add 1 2")
\ No newline at end of file
+        parse("(add 1 2")
+
+def test_parse_comment_inside_string_is_preserved():
+    source = '(print ";; not a comment") ; a real comment'
+    expected_ast = [Symbol('print'), ';; not a comment']
+    assert parse(source) == expected_ast
+
+def test_parse_stream_multiple_expressions():
+    source = "(add 1 2) 'x (mul 3 4)"
+    expected_asts = [
+        [Symbol('add'), 1, 2],
+        [Symbol('quote'), Symbol('x')],
+        [Symbol('mul'), 3, 4],
+    ]
+    assert parse_stream(source) == expected_asts
+
+def test_parse_stream_iter_yields_before_later_errors():
+    asts = parse_stream_iter("(add 1 2) (mul 3")
+    assert next(asts) == [Symbol('add'), 1, 2]
+    with pytest.raises(LogosSyntaxError):
+        next(asts)
+
+def test_tokenize_reader_prefixes():
+    source = "`(a ,b ,@c 'd) ; comment\n\"x ; y\""
+    assert tokenize(source) == ['`', '(', 'a', ',', 'b', ',@', 'c', "'", 'd', ')', '"x ; y"']
+
+def test_parse_interns_symbols():
+    first, second = parse("(add add)")
+    assert first is second is Symbol('add')
+
+def test_parse_signed_numbers_and_symbols():
+    source = "(- -1 +2 -.5 -x inf)"
+    expected_ast = [Symbol('-'), -1, 2, -0.5, Symbol('-x'), Symbol('inf')]
+    assert parse(source) == expected_ast
+
+def test_parse_cache_returns_independent_asts():
+    first = parse("(add (mul 1 2) 3)")
+    first[1][0] = Symbol('sub')
+    assert parse("(add (mul 1 2) 3)") == [Symbol('add'), [Symbol('mul'), 1, 2], 3]
+
+def test_parse_file_iter_caches_until_file_changes(tmp_path):
+    path = tmp_path / "sample.l0"
+    path.write_text("(add 1 2)")
+    assert list(parse_file_iter(str(path))) == [[Symbol('add'), 1, 2]]
+
+    # Cached forms are handed out as fresh copies.
+    first = list(parse_file_iter(str(path)))
+    first[0][0] = Symbol('sub')
+    assert list(parse_file_iter(str(path))) == [[Symbol('add'), 1, 2]]
+
+    path.write_text("(mul 3 4) (sub 5 6)")
+    os.utime(path, ns=(0, 0))
+    assert list(parse_file_iter(str(path))) == [[Symbol('mul'), 3, 4], [Symbol('sub'), 5, 6]]
+
+def test_parse_file_iter_reuses_pickled_forms(tmp_path, monkeypatch):
+    path = tmp_path / "sample.l0"
+    path.write_text("(add 1 \"two\")")
+    assert list(parse_file_iter(str(path))) == [[Symbol('add'), 1, "two"]]
+    assert (tmp_path / "__pycache__" / "sample.l0.pkl").exists()
+
+    # A new process starts with an empty in-memory cache; the pickle is
+    # used instead of the source, with its symbols interned again.
+    monkeypatch.setattr(parser, '_FILE_CACHE', {})
+    monkeypatch.setattr(parser, 'parse_stream_iter', None)
+    forms = list(parse_file_iter(str(path)))
+    assert forms == [[Symbol('add'), 1, "two"]]
+    assert forms[0][0] is Symbol('add')
+    assert not isinstance(forms[0][2], Symbol)
+
+def test_parse_file_iter_ignores_unsafe_or_outdated_pickles(tmp_path, monkeypatch):
+    path = tmp_path / "sample.l0"
+    path.write_text("(add 1 2)")
+    list(parse_file_iter(str(path)))
+    pickle_path = tmp_path / "__pycache__" / "sample.l0.pkl"
+    stat = os.stat(path)
+    key = (stat.st_mtime_ns, stat.st_size)
+
+    class Planted:
+        def __reduce__(self):
+            return (os.remove, (str(path),))
+
+    for planted in [((parser._PICKLE_FORMAT, key), Planted()),
+                    ((parser._PICKLE_FORMAT - 1, key), ((Symbol('stale'),),)),
+                    ((parser._PICKLE_FORMAT, key), 42)]:
+        pickle_path.write_bytes(pickle.dumps(planted))
+        monkeypatch.setattr(parser, '_FILE_CACHE', {})
+        assert list(parse_file_iter(str(path))) == [[Symbol('add'), 1, 2]]
+        assert path.exists()
+
+def test_parse_file_iter_ignores_pickles_others_can_write(tmp_path, monkeypatch):
+    path = tmp_path / "sample.l0"
+    path.write_text("(add 1 2)")
+    list(parse_file_iter(str(path)))
+    cache_dir = tmp_path / "__pycache__"
+    pickle_path = cache_dir / "sample.l0.pkl"
+    stat = os.stat(path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    pickle_path.write_bytes(pickle.dumps(((parser._PICKLE_FORMAT, key), ((Symbol('planted'),),))))
+
+    for writable, mode in [(pickle_path, 0o666), (cache_dir, 0o777)]:
+        original_mode = os.stat(writable).st_mode
+        os.chmod(writable, mode)
+        try:
+            monkeypatch.setattr(parser, '_FILE_CACHE', {})
+            assert list(parse_file_iter(str(path))) == [[Symbol('add'), 1, 2]]
+        finally:
+            os.chmod(writable, original_mode)
+        pickle_path.write_bytes(pickle.dumps(((parser._PICKLE_FORMAT, key), ((Symbol('planted'),),))))
+
+    # The same pickle is used once only its owner can write it.
+    monkeypatch.setattr(parser, '_FILE_CACHE', {})
+    assert list(parse_file_iter(str(path))) == [[Symbol('planted')]]